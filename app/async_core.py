@@ -0,0 +1,46 @@
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from .core import music_manager, DownloadOptions
+
+
+async def _bounded(sem: asyncio.Semaphore, func, *args, **kwargs):
+    """Run a blocking pyncm call in a worker thread, limited by `sem`."""
+    async with sem:
+        return await asyncio.to_thread(func, *args, **kwargs)
+
+
+async def fetch_all(
+    tracks: List[Dict[str, Any]],
+    opts: Optional[DownloadOptions] = None,
+    batch_size: int = 100,
+    concurrency: int = 16,
+) -> Dict[int, Dict[str, Any]]:
+    """Prefetch audio URLs and disk-cacheable covers for tracks not yet on disk; returns audio entries by song id."""
+    if opts is None:
+        opts = DownloadOptions.from_config()
+    sem = asyncio.Semaphore(concurrency)
+
+    tracks = music_manager.pending_tracks(tracks, opts)
+    quality = music_manager._resolve_quality(opts)
+    ids = [t["id"] for t in tracks]
+    audio_jobs = [
+        _bounded(sem, music_manager._prefetch_audio_batch, ids[i:i + batch_size], quality, opts.use_download_api)
+        for i in range(0, len(ids), batch_size)
+    ]
+
+    covers: Dict[str, int] = {}
+    for t in tracks:
+        album = t.get("al") or {}
+        if album.get("picUrl") and album.get("id"):
+            covers.setdefault(album["picUrl"], album["id"])
+    cover_jobs = [
+        _bounded(sem, music_manager.download_cover, url, quiet=True, album_id=album_id)
+        for url, album_id in covers.items()
+    ]
+
+    results = await asyncio.gather(*audio_jobs, *cover_jobs)
+    audios: Dict[int, Dict[str, Any]] = {}
+    for batch_audios in results[:len(audio_jobs)]:
+        audios.update(batch_audios)
+    return audios
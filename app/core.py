@@ -1,10 +1,15 @@
 import os
+import json
 import time
 import re
 import io
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from concurrent.futures import Future, ThreadPoolExecutor
 from difflib import SequenceMatcher
 from pathlib import Path
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, BinaryIO
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
@@ -12,7 +17,7 @@ import pyncm
 from pyncm import apis
 from pyncm.apis import login, playlist, track
 from mutagen import File as MutagenFile
-from mutagen.id3 import ID3, APIC, TIT2, TPE1, TALB, USLT
+from mutagen.id3 import ID3, ID3NoHeaderError, APIC, TIT2, TPE1, TALB, USLT
 from mutagen.mp3 import MP3
 from mutagen.flac import FLAC, Picture
 from PIL import Image, ImageDraw
@@ -21,22 +26,111 @@ _pil_utils_error = None
 from .utils import logger
 from .config import config_manager
 
+# Characters not allowed in filenames on common filesystems
+_UNSAFE_FILENAME_CHARS = str.maketrans("", "", '\\/*?:"<>|')
+
+# Retrying adapter with a keep-alive pool large enough for parallel downloads,
+# shared by every session we configure
+_RETRY = Retry(total=5, backoff_factor=1, status_forcelist=[500, 502, 503, 504])
+_ADAPTER = HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=_RETRY)
+
+# Album covers persisted across runs, keyed by album id
+_COVER_CACHE_DIR = Path.home() / ".cache" / "nonencm" / "covers"
+# Downloads up to this size are tagged in memory; larger ones go through a temp file
+# so parallel hi-res downloads do not each hold a whole file in RAM
+_IN_MEMORY_DOWNLOAD_LIMIT = 32 << 20
+
+# Freshness used when the CDN sends no Cache-Control max-age
+_COVER_DEFAULT_MAX_AGE = 86400
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+
+# Constant cover frame arguments, shared by every embed call
+_APIC_KW = dict(encoding=3, mime="image/jpeg", type=3, desc="Cover")
+_PICTURE_KW = dict(type=3, mime="image/jpeg", desc="Cover")
+
+
+def _embed_mp3(fileobj: BinaryIO, song_info: Dict[str, Any], cover_data: Optional[bytes], artist_names: List[str]):
+    try:
+        fileobj.seek(0)
+        tags = ID3(fileobj)
+    except ID3NoHeaderError:
+        tags = ID3()
+
+    tags.add(TIT2(encoding=3, text=song_info["name"]))
+    tags.add(TPE1(encoding=3, text=artist_names))
+    tags.add(TALB(encoding=3, text=song_info["al"]["name"]))
+    if cover_data:
+        tags.add(APIC(data=cover_data, **_APIC_KW))
+    fileobj.seek(0)
+    tags.save(fileobj, v2_version=4)
+
+
+def _embed_flac(fileobj: BinaryIO, song_info: Dict[str, Any], cover_data: Optional[bytes], artist_names: List[str]):
+    fileobj.seek(0)
+    audio = FLAC(fileobj)
+    audio.update({
+        "title": song_info["name"],
+        "artist": artist_names,
+        "album": song_info["al"]["name"],
+    })
+    if cover_data:
+        pic = Picture()
+        for key, value in _PICTURE_KW.items():
+            setattr(pic, key, value)
+        pic.data = cover_data
+        audio.add_picture(pic)
+    fileobj.seek(0)
+    audio.save(fileobj)
+
+
+# Tag writers by lowercase file extension
+_EMBEDDERS = {".mp3": _embed_mp3, ".flac": _embed_flac}
+
+
+@dataclass(slots=True)
+class DownloadOptions:
+    """Snapshot of download settings, taken once per batch instead of per track."""
+    quality: str
+    preferred_format: str
+    template: str
+    download_lrc: bool
+    use_download_api: bool
+    overwrite: bool
+    output_dir: Path
+
+    @classmethod
+    def from_config(cls) -> "DownloadOptions":
+        return cls(
+            quality=config_manager.get("quality", "exhigh"),
+            preferred_format=config_manager.get("preferred_format", "auto"),
+            template=config_manager.get("template", "{title} - {artist}"),
+            download_lrc=config_manager.get("download_lyrics", False),
+            use_download_api=config_manager.get("use_download_api", False),
+            overwrite=config_manager.get("overwrite", False),
+            output_dir=Path(config_manager.get("output_dir", "downloads")),
+        )
+
 class MusicManager:
     def __init__(self):
         self.session_file = Path("session.pyncm")
         self._is_logged_in_cache = False
         self._last_login_check = 0
         self.audio_exts = {".mp3", ".flac", ".m4a", ".wav", ".ogg", ".aac"}
+        self._cover_cache: OrderedDict[str, bytes] = OrderedDict()
+        self._cover_cache_size = 128
+        self._cover_lock = threading.Lock()
+        self._io_pool: Optional[ThreadPoolExecutor] = None
+        self._io_pool_workers = 0
+        self._io_lock = threading.Lock()
         self.load_session()
         self.configure_session()
 
     def configure_session(self):
-        """Configure session with retries."""
-        retry = Retry(total=5, backoff_factor=1, status_forcelist=[500, 502, 503, 504])
-        adapter = HTTPAdapter(max_retries=retry)
+        """Mount the shared retrying adapter on the current session."""
         sess = pyncm.GetCurrentSession()
-        sess.mount("http://", adapter)
-        sess.mount("https://", adapter)
+        sess.mount("http://", _ADAPTER)
+        sess.mount("https://", _ADAPTER)
 
     def load_session(self):
         """Load session from file if exists."""
@@ -48,8 +142,6 @@ class MusicManager:
                 logger.info("Session loaded.")
             except Exception as e:
                 logger.error(f"Failed to load session: {e}")
-            finally:
-                self.configure_session()
 
     def save_session(self):
         """Save current session to file."""
@@ -156,23 +248,106 @@ class MusicManager:
             logger.error(f"Failed to get playlist tracks: {e}")
             return []
 
-    def download_cover(self, url: str, quiet: bool = False) -> Optional[bytes]:
-        """Download cover image."""
+    def _remember_cover(self, url: str, data: bytes):
+        with self._cover_lock:
+            self._cover_cache[url] = data
+            if len(self._cover_cache) > self._cover_cache_size:
+                self._cover_cache.popitem(last=False)
+
+    def _write_cover_meta(self, meta_path: Path, headers, previous: Optional[Dict[str, Any]] = None):
+        """Store validators, cache policy and freshness for a cached cover.
+
+        `previous` supplies the validators and policy a 304 response omits.
+        """
+        previous = previous or {}
+        cache_control = headers.get("Cache-Control")
+        if cache_control is not None:
+            cache_control = cache_control.lower()
+            no_cache = "no-cache" in cache_control or "no-store" in cache_control
+            match = _MAX_AGE_RE.search(cache_control)
+            max_age = int(match.group(1)) if match else None
+        else:
+            no_cache = previous.get("no_cache", False)
+            max_age = previous.get("max_age")
+        if no_cache:
+            ttl = 0
+        else:
+            ttl = max_age if max_age is not None else _COVER_DEFAULT_MAX_AGE
+        meta = {
+            "etag": headers.get("ETag") or previous.get("etag"),
+            "last_modified": headers.get("Last-Modified") or previous.get("last_modified"),
+            "no_cache": no_cache,
+            "max_age": max_age,
+            "expires": time.time() + ttl,
+        }
+        tmp_path = meta_path.with_name(f"{meta_path.name}.{threading.get_ident()}.tmp")
+        tmp_path.write_text(json.dumps(meta), encoding="utf-8")
+        os.replace(tmp_path, meta_path)
+
+    def download_cover(self, url: str, quiet: bool = False, album_id: Optional[int] = None) -> Optional[bytes]:
+        """Download cover image (cached in memory per URL, and on disk per album when `album_id` is given).
+
+        Disk entries are served directly while fresh and revalidated with a conditional GET afterwards.
+        """
         log_error = logger.error if not quiet else lambda *a, **k: None
+        with self._cover_lock:
+            if url in self._cover_cache:
+                self._cover_cache.move_to_end(url)
+                return self._cover_cache[url]
+
+        cache_path = _COVER_CACHE_DIR / f"{album_id}.jpg" if album_id else None
+        meta_path = cache_path.with_suffix(".meta") if cache_path is not None else None
+        cached = None
+        meta: Dict[str, Any] = {}
+        headers = {"Connection": "keep-alive"}
+        if cache_path is not None and cache_path.exists():
+            try:
+                cached = cache_path.read_bytes()
+                meta = json.loads(meta_path.read_text(encoding="utf-8")) if meta_path.exists() else {}
+            except (OSError, ValueError):
+                meta = {}
+            if cached is not None:
+                # A missing or unreadable sidecar counts as stale: no validators, so a plain GET rewrites it
+                if meta.get("expires", 0) > time.time():
+                    self._remember_cover(url, cached)
+                    return cached
+                if meta.get("etag"):
+                    headers["If-None-Match"] = meta["etag"]
+                if meta.get("last_modified"):
+                    headers["If-Modified-Since"] = meta["last_modified"]
+
         try:
-            r = pyncm.GetCurrentSession().get(url, timeout=20)
+            r = pyncm.GetCurrentSession().get(url, timeout=20, headers=headers)
+            if r.status_code == 304 and cached is not None:
+                self._remember_cover(url, cached)
+                try:
+                    self._write_cover_meta(meta_path, r.headers, previous=meta)
+                except OSError as e:
+                    log_error(f"Failed to cache cover: {e}")
+                return cached
             if r.status_code == 200:
+                self._remember_cover(url, r.content)
+                if cache_path is not None:
+                    try:
+                        cache_path.parent.mkdir(parents=True, exist_ok=True)
+                        tmp_path = cache_path.with_name(f"{cache_path.name}.{threading.get_ident()}.tmp")
+                        tmp_path.write_bytes(r.content)
+                        os.replace(tmp_path, cache_path)
+                        self._write_cover_meta(meta_path, r.headers)
+                    except OSError as e:
+                        log_error(f"Failed to cache cover: {e}")
                 return r.content
         except Exception as e:
             log_error(f"Failed to download cover: {e}")
-        return None
+        # Fall back to a stale cached copy if revalidation failed
+        return cached
 
-    def download_lyrics(self, song_id: int, filepath: Path, quiet: bool = False):
-        """Download and save lyrics."""
+    def download_lyrics(self, song_id: int, filepath: Path, quiet: bool = False, lyrics_future: Optional[Future] = None):
+        """Download and save lyrics, optionally from an already submitted GetTrackLyrics call."""
         log_info = logger.info if not quiet else lambda *a, **k: None
         log_error = logger.error if not quiet else lambda *a, **k: None
         try:
-            res = track.GetTrackLyrics(song_id)
+            res = lyrics_future.result() if lyrics_future is not None else track.GetTrackLyrics(song_id)
             if res.get("code") != 200:
                 return
 
@@ -192,62 +367,36 @@ class MusicManager:
         except Exception as e:
             log_error(f"Failed to download lyrics: {e}")
 
-    def embed_metadata(self, filepath: Path, song_info: Dict[str, Any], cover_data: Optional[bytes], quiet: bool = False):
-        """Embed metadata and cover art."""
+    def embed_metadata(self, filepath: Path, song_info: Dict[str, Any], cover_data: Optional[bytes], quiet: bool = False, fileobj: Optional[BinaryIO] = None, artist_names: Optional[List[str]] = None):
+        """Embed metadata and cover art into `fileobj`, or into `filepath` through a 1 MiB buffer.
+
+        `artist_names` may be passed when the caller already split the artists for this track.
+        """
         log_error = logger.error if not quiet else lambda *a, **k: None
+        embedder = _EMBEDDERS.get(filepath.suffix.lower())
+        if embedder is None:
+            return
+        if artist_names is None:
+            artist_names = [ar["name"] for ar in song_info["ar"]]
+        if fileobj is None:
+            # A large buffer turns mutagen's many small reads/writes into a few syscalls
+            try:
+                with open(filepath, "r+b", buffering=1 << 20) as fh:
+                    self.embed_metadata(filepath, song_info, cover_data, quiet=quiet, fileobj=fh, artist_names=artist_names)
+            except OSError as e:
+                log_error(f"Failed to embed metadata for {filepath}: {e}")
+            return
         try:
-            ext = filepath.suffix.lower()
-            if ext == ".mp3":
-                try:
-                    audio = MP3(filepath, ID3=ID3)
-                except Exception:
-                    audio = MP3(filepath)
-                    audio.add_tags()
-                
-                if audio.tags is None:
-                    audio.add_tags()
-                
-                # Basic tags
-                audio.tags.add(TIT2(encoding=3, text=song_info["name"]))
-                audio.tags.add(TPE1(encoding=3, text=[ar["name"] for ar in song_info["ar"]]))
-                audio.tags.add(TALB(encoding=3, text=song_info["al"]["name"]))
-
-                # Cover art
-                if cover_data:
-                    audio.tags.add(
-                        APIC(
-                            encoding=3,
-                            mime='image/jpeg',
-                            type=3,
-                            desc=u'Cover',
-                            data=cover_data
-                        )
-                    )
-                audio.save()
-            
-            elif ext == ".flac":
-                audio = FLAC(filepath)
-                audio["title"] = song_info["name"]
-                audio["artist"] = [ar["name"] for ar in song_info["ar"]]
-                audio["album"] = song_info["al"]["name"]
-                
-                if cover_data:
-                    pic = Picture()
-                    pic.type = 3
-                    pic.mime = 'image/jpeg'
-                    pic.desc = 'Cover'
-                    pic.data = cover_data
-                    audio.add_picture(pic)
-                audio.save()
-                
+            embedder(fileobj, song_info, cover_data, artist_names)
         except Exception as e:
             log_error(f"Failed to embed metadata for {filepath}: {e}")
 
-    def get_filename(self, template: str, song_info: Dict[str, Any], ext: str) -> str:
-        """Generate filename based on template."""
+    def get_filename(self, template: str, song_info: Dict[str, Any], ext: str, artists: Optional[str] = None) -> str:
+        """Generate filename based on template; `artists` may be passed pre-joined."""
         try:
             # Prepare template variables
-            artists = ", ".join([ar["name"] for ar in song_info["ar"]])
+            if artists is None:
+                artists = ", ".join(ar["name"] for ar in song_info["ar"])
             title = song_info["name"]
             album = song_info["al"]["name"]
             track_no = song_info.get("no", "")
@@ -255,9 +404,9 @@ class MusicManager:
             id_ = song_info["id"]
             
             # Safe filename
-            safe_title = re.sub(r'[\\/*?:"<>|]', "", title)
-            safe_artists = re.sub(r'[\\/*?:"<>|]', "", artists)
-            safe_album = re.sub(r'[\\/*?:"<>|]', "", album)
+            safe_title = title.translate(_UNSAFE_FILENAME_CHARS)
+            safe_artists = artists.translate(_UNSAFE_FILENAME_CHARS)
+            safe_album = album.translate(_UNSAFE_FILENAME_CHARS)
             
             filename = template.format(
                 title=safe_title,
@@ -664,65 +813,164 @@ class MusicManager:
         logger.success(f"Playlist exported to {output_path}")
         return output_path
 
-    def download_song(self, song_id: int, song_name: str, artist_name: str, output_dir: Optional[Path] = None, quiet: bool = False, force_overwrite: Optional[bool] = None) -> Optional[Path]:
-        """Download a song by ID."""
+    def _resolve_quality(self, opts: DownloadOptions, log_info=None) -> str:
+        """Return configured quality adjusted to the preferred format."""
+        log_info = log_info or (lambda *a, **k: None)
+        quality = opts.quality
+        preferred_format = opts.preferred_format
+        if preferred_format == "mp3":
+            if quality in ["lossless", "hires"]:
+                log_info("Downgrading quality to exhigh for MP3 preference.")
+                quality = "exhigh"
+        elif preferred_format == "flac":
+            if quality in ["standard", "exhigh"]:
+                log_info("Upgrading quality to lossless for FLAC preference.")
+                quality = "lossless"
+        return quality
+
+    def _prefetch_audio_batch(self, song_ids: List[int], quality: str, use_download_api: bool) -> Dict[int, Dict[str, Any]]:
+        """Fetch audio URL entries for one batch of ids in a single API call."""
+        audios: Dict[int, Dict[str, Any]] = {}
+        try:
+            if use_download_api:
+                audio_res = track.GetTrackAudio(song_ids)
+            else:
+                audio_res = track.GetTrackAudioV1(song_ids, level=quality)
+            if audio_res.get("code") == 200:
+                fetched_at = time.time()
+                for data in audio_res.get("data") or []:
+                    # Remember when the URL was issued so stale ones can be skipped
+                    data["_fetched_at"] = fetched_at
+                    audios[data["id"]] = data
+        except Exception as e:
+            logger.error(f"Failed to prefetch audio URLs: {e}")
+        return audios
+
+    def prefetch_playlist(self, song_ids: List[int], batch_size: int = 100, opts: Optional[DownloadOptions] = None) -> Dict[int, Dict[str, Any]]:
+        """Fetch audio URL entries in batches; returns them keyed by song id."""
+        if opts is None:
+            opts = DownloadOptions.from_config()
+        quality = self._resolve_quality(opts)
+        audios: Dict[int, Dict[str, Any]] = {}
+        for i in range(0, len(song_ids), batch_size):
+            audios.update(self._prefetch_audio_batch(song_ids[i:i + batch_size], quality, opts.use_download_api))
+        return audios
+
+    def find_existing_file(self, song_info: Dict[str, Any], opts: DownloadOptions, artists: Optional[str] = None, output_dir: Optional[Path] = None) -> Optional[Path]:
+        """Return an already downloaded file for this song, if any.
+
+        The real extension is only known from the audio URL response, so "auto" checks both candidates.
+        """
+        if output_dir is None:
+            output_dir = opts.output_dir
+        if opts.preferred_format in ("mp3", "flac"):
+            candidate_exts = [opts.preferred_format]
+        else:
+            candidate_exts = ["mp3", "flac"]
+        for candidate_ext in candidate_exts:
+            existing = output_dir / self.get_filename(opts.template, song_info, candidate_ext, artists=artists)
+            if existing.exists():
+                return existing
+        return None
+
+    def pending_tracks(self, tracks: List[Dict[str, Any]], opts: DownloadOptions) -> List[Dict[str, Any]]:
+        """Filter out tracks already on disk, so they are never sent to the audio URL API."""
+        if opts.overwrite:
+            return list(tracks)
+        return [t for t in tracks if self.find_existing_file(t, opts) is None]
+
+    def _io_executor(self) -> ThreadPoolExecutor:
+        """Pool for cover/lyrics jobs, grown to two workers per concurrent download."""
+        workers = 2 * max(1, int(config_manager.get("concurrency", 6)))
+        with self._io_lock:
+            if self._io_pool is None or self._io_pool_workers < workers:
+                old_pool = self._io_pool
+                self._io_pool = ThreadPoolExecutor(max_workers=workers)
+                self._io_pool_workers = workers
+                if old_pool is not None:
+                    # Already submitted jobs still run to completion
+                    old_pool.shutdown(wait=False)
+            return self._io_pool
+
+    def _audio_entry_fresh(self, audio: Optional[Dict[str, Any]]) -> bool:
+        """Whether a prefetched audio entry still has a URL that has not expired."""
+        if not audio or not audio.get("url"):
+            return False
+        # Keep a small margin so the download starts well before the URL dies
+        age = time.time() - audio.get("_fetched_at", 0)
+        return age < audio.get("expi", 0) - 30
+
+    def _fetch_audio_entry(self, song_id: int, quality: str, use_download_api: bool) -> Optional[Dict[str, Any]]:
+        """Request the audio URL entry for one song, falling back to the download API."""
+        if use_download_api:
+            audio_res = track.GetTrackAudio(song_id)
+        else:
+            audio_res = track.GetTrackAudioV1(song_id, level=quality)
+        
+        if audio_res["code"] != 200 or not audio_res["data"]:
+            # Fallback if V1 failed and we didn't force download api
+            if not use_download_api:
+                audio_res = track.GetTrackAudio(song_id)
+        
+        if audio_res["code"] != 200 or not audio_res["data"]:
+            return None
+        return audio_res["data"][0]
+
+    def download_song(self, song_id: int, song_name: str, artist_name: str, output_dir: Optional[Path] = None, quiet: bool = False, force_overwrite: Optional[bool] = None, song_info: Optional[Dict[str, Any]] = None, audio: Optional[Dict[str, Any]] = None, opts: Optional[DownloadOptions] = None) -> Optional[Path]:
+        """Download a song by ID. Supplied `song_info`/`audio` entries skip the per-song API calls."""
         log_info = logger.info if not quiet else lambda *a, **k: None
         log_warning = logger.warning if not quiet else lambda *a, **k: None
         log_error = logger.error if not quiet else lambda *a, **k: None
+        if opts is None:
+            opts = DownloadOptions.from_config()
         if output_dir is None:
-            output_dir = Path(config_manager.get("output_dir", "downloads"))
+            output_dir = opts.output_dir
         
         output_dir.mkdir(parents=True, exist_ok=True)
         
         try:
             # Get configuration
-            quality = config_manager.get("quality", "exhigh")
-            preferred_format = config_manager.get("preferred_format", "auto")
-            template = config_manager.get("template", "{title} - {artist}")
-            download_lrc = config_manager.get("download_lyrics", False)
-            use_download_api = config_manager.get("use_download_api", False)
-            overwrite = config_manager.get("overwrite", False)
-            effective_overwrite = overwrite if force_overwrite is None else force_overwrite
-
-            # Adjust quality based on preferred format
-            if preferred_format == "mp3":
-                if quality in ["lossless", "hires"]:
-                    log_info("Downgrading quality to exhigh for MP3 preference.")
-                    quality = "exhigh"
-            elif preferred_format == "flac":
-                if quality in ["standard", "exhigh"]:
-                    log_info("Upgrading quality to lossless for FLAC preference.")
-                    quality = "lossless"
+            template = opts.template
+            download_lrc = opts.download_lrc
+            use_download_api = opts.use_download_api
+            effective_overwrite = opts.overwrite if force_overwrite is None else force_overwrite
+            quality = self._resolve_quality(opts, log_info)
 
             # Get song info first to determine filename
-            detail_res = track.GetTrackDetail(song_id)
-            if detail_res.get("code") == 200 and "songs" in detail_res:
-                song_info = detail_res["songs"][0]
+            if song_info is not None:
+                # Callers passing song_info joined artist_name from the same entry
+                has_detail = True
+                artists = artist_name
             else:
-                # Mock info if fail
-                song_info = {"name": song_name, "ar": [{"name": artist_name}], "al": {"name": "Unknown"}, "id": song_id}
-
-            # We need extension to check existence, but we don't know it yet without audio url...
-            # Actually we can guess or just get audio url first.
-            # But wait, if we get audio url, we might be "using" the API.
-            # However, standard flow is get audio -> get ext -> check file.
-            
-            # Get audio URL
-            if use_download_api:
-                audio_res = track.GetTrackAudio(song_id)
+                detail_res = track.GetTrackDetail(song_id)
+                has_detail = detail_res.get("code") == 200 and "songs" in detail_res
+                if has_detail:
+                    song_info = detail_res["songs"][0]
+                    artists = None
+                else:
+                    # Mock info if fail
+                    song_info = {"name": song_name, "ar": [{"name": artist_name}], "al": {"name": "Unknown"}, "id": song_id}
+                    artists = artist_name
+            # Split once per track; reused for the filename and the tag writers
+            artist_names = [ar["name"] for ar in song_info["ar"]]
+            if artists is None:
+                artists = ", ".join(artist_names)
+
+            # Check for an existing file before requesting the audio URL
+            if not effective_overwrite:
+                existing = self.find_existing_file(song_info, opts, artists=artists, output_dir=output_dir)
+                if existing is not None:
+                    log_info(f"File already exists: {existing}")
+                    return existing
+
+            # Get audio URL (prefetched entries without a live URL fall back to a fresh request)
+            if self._audio_entry_fresh(audio):
+                data = audio
             else:
-                audio_res = track.GetTrackAudioV1(song_id, level=quality)
-            
-            if audio_res["code"] != 200 or not audio_res["data"]:
-                # Fallback if V1 failed and we didn't force download api
-                if not use_download_api:
-                    audio_res = track.GetTrackAudio(song_id)
-            
-            if audio_res["code"] != 200 or not audio_res["data"]:
-                log_error(f"Failed to get audio URL for {song_name}")
-                return None
-
-            data = audio_res["data"][0]
+                data = self._fetch_audio_entry(song_id, quality, use_download_api)
+                if data is None:
+                    log_error(f"Failed to get audio URL for {song_name}")
+                    return None
             url = data["url"]
             if not url:
                 log_warning(f"No download URL for {song_name} (VIP/Copyright?)")
@@ -731,32 +979,69 @@ class MusicManager:
             ext = data["type"]
             if not ext: ext = "mp3" # Default fallback
             
-            filename = self.get_filename(template, song_info, ext)
+            filename = self.get_filename(template, song_info, ext, artists=artists)
             filepath = output_dir / filename
 
             if filepath.exists() and not effective_overwrite:
                 log_info(f"File already exists: {filepath}")
                 return filepath
 
+            # Fetch cover and lyrics in the background while the audio streams
+            io_pool = self._io_executor()
+            cover_future = None
+            if has_detail:
+                cover_future = io_pool.submit(
+                    self.download_cover,
+                    song_info["al"]["picUrl"],
+                    quiet=quiet,
+                    album_id=song_info["al"].get("id"),
+                )
+            lrc_future = io_pool.submit(track.GetTrackLyrics, song_id) if download_lrc else None
+
             log_info(f"Downloading {filename} [{quality}]...")
             r = pyncm.GetCurrentSession().get(url, stream=True, timeout=60)
-            with open(filepath, "wb") as f:
-                for chunk in r.iter_content(chunk_size=1024):
-                    if chunk:
-                        f.write(chunk)
-            
+            if r.status_code in (403, 404):
+                # The URL expired or was revoked; request a new one once
+                r.close()
+                data = self._fetch_audio_entry(song_id, quality, use_download_api)
+                if data is None or not data["url"]:
+                    log_error(f"Failed to refresh audio URL for {song_name}")
+                    return None
+                r = pyncm.GetCurrentSession().get(data["url"], stream=True, timeout=60)
+            r.raise_for_status()
+            content_length = int(r.headers.get("Content-Length") or 0)
+            if 0 < content_length <= _IN_MEMORY_DOWNLOAD_LIMIT:
+                # Small enough to buffer in memory, so tags are embedded before the single write to disk
+                buf = io.BytesIO()
+                for chunk in r.iter_content(chunk_size=1 << 17):
+                    buf.write(chunk)
+                
+                # Embed metadata
+                if cover_future is not None:
+                    cover_data = cover_future.result()
+                    self.embed_metadata(filepath, song_info, cover_data, quiet=quiet, fileobj=buf, artist_names=artist_names)
+                    log_info(f"Metadata embedded for {filename}")
+
+                filepath.write_bytes(buf.getbuffer())
+            else:
+                # Large or unknown size (e.g. hi-res FLAC): stream to a temp file, tag it on disk, then rename
+                tmp_path = filepath.with_name(f".{filepath.stem}.part{filepath.suffix}")
+                try:
+                    with open(tmp_path, "wb", buffering=1 << 20) as f:
+                        for chunk in r.iter_content(chunk_size=1 << 17):
+                            f.write(chunk)
+                    if cover_future is not None:
+                        cover_data = cover_future.result()
+                        self.embed_metadata(tmp_path, song_info, cover_data, quiet=quiet, artist_names=artist_names)
+                        log_info(f"Metadata embedded for {filename}")
+                    os.replace(tmp_path, filepath)
+                finally:
+                    tmp_path.unlink(missing_ok=True)
             log_info(f"Downloaded to {filepath}")
             
-            # Embed metadata
-            if detail_res.get("code") == 200:
-                cover_url = song_info["al"]["picUrl"]
-                cover_data = self.download_cover(cover_url, quiet=quiet)
-                self.embed_metadata(filepath, song_info, cover_data, quiet=quiet)
-                log_info(f"Metadata embedded for {filename}")
-            
             # Download lyrics
-            if download_lrc:
-                self.download_lyrics(song_id, filepath, quiet=quiet)
+            if lrc_future is not None:
+                self.download_lyrics(song_id, filepath, quiet=quiet, lyrics_future=lrc_future)
 
             return filepath
 
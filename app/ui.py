@@ -1,15 +1,20 @@
-import time
+import asyncio
+import os
 import re
 import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
-from urllib.parse import urlparse, parse_qs
 from noneprompt import ListPrompt, Choice, InputPrompt, CancelledError
 from qqmusic_api.login import PhoneLoginEvents, QRLoginType
-from .core import music_manager
+from .core import music_manager, DownloadOptions
+from .async_core import fetch_all
 from .qq import qq_music_manager
 from .config import config_manager
 from .utils import logger, save_qr_and_open
 
+_NCM_ID_RE = re.compile(r"[?&]id=(\d+)")
+
 class UI:
     def run(self):
         output_dir = Path(config_manager.get('output_dir', 'downloads')).absolute()
@@ -70,43 +75,20 @@ class UI:
         """Parse N Music URL."""
         if "music.163.com" not in url:
             return None, None
-            
-        parsed = urlparse(url)
-        params = parse_qs(parsed.query)
-        # Handle fragment-style links like https://music.163.com/#/playlist?id=XXXX
-        frag_path = parsed.fragment
-        frag_params = {}
-        if frag_path:
-            if "?" in frag_path:
-                frag_path_part, frag_query = frag_path.split("?", 1)
-                frag_params = parse_qs(frag_query)
-            else:
-                frag_path_part = frag_path
-            # Merge fragment-derived params if present
-            if "id" in frag_params and "id" not in params:
-                params["id"] = frag_params["id"]
-            # If the fragment path explicitly contains playlist/song, reflect that
-            if not parsed.path or parsed.path == "/":
-                parsed = parsed._replace(path=frag_path_part if frag_path_part.startswith("/") else f"/{frag_path_part}")
-        
-        if "playlist" in url or "playlist" in params.get("id", [""])[0]:
-            if "id" in params:
-                return "playlist", params["id"][0]
-        elif "song" in url:
-             if "id" in params:
-                return "song", params["id"][0]
-        
-        if "id" in params:
-            if "/playlist" in parsed.path:
-                return "playlist", params["id"][0]
-            if "/song" in parsed.path:
-                return "song", params["id"][0]
-
-        # Fallback: regex for playlist/song id in any part of the URL
-        match = re.search(r"(playlist|song)[^\\d]*(\\d+)", url)
-        if match:
-            return match.group(1), match.group(2)
-                
+        # Every supported link carries the id as a query parameter (possibly inside
+        # the fragment, e.g. https://music.163.com/#/playlist?id=XXXX)
+        if "?" not in url:
+            return None, None
+
+        match = _NCM_ID_RE.search(url)
+        if not match:
+            return None, None
+        id_ = match.group(1)
+
+        if "playlist" in url:
+            return "playlist", id_
+        if "song" in url:
+            return "song", id_
         return None, None
 
     def _split_keywords(self, text: str):
@@ -123,7 +105,7 @@ class UI:
     def _select_song_from_results(self, songs, title: str, back_label: str):
         song_choices = []
         for song in songs:
-            artists = ", ".join([ar["name"] for ar in song["ar"]])
+            artists = ", ".join(ar["name"] for ar in song["ar"])
             name = song["name"]
             song_choices.append(Choice(f"{name} - {artists}", data=song))
 
@@ -132,7 +114,7 @@ class UI:
         return selected_song.data
 
     def _start_download(self, song, background: bool = False, force_overwrite: bool = None, quiet: bool = False):
-        artists = ", ".join([ar["name"] for ar in song["ar"]])
+        artists = ", ".join(ar["name"] for ar in song["ar"])
         if background:
             t = threading.Thread(
                 target=music_manager.download_song,
@@ -151,6 +133,34 @@ class UI:
                 force_overwrite=force_overwrite,
             )
 
+    def _download_one(self, track, audios=None, opts=None):
+        artists = ", ".join(ar["name"] for ar in track["ar"])
+        return music_manager.download_song(
+            track["id"],
+            track["name"],
+            artists,
+            song_info=track,
+            audio=(audios or {}).get(track["id"]),
+            opts=opts,
+        )
+
+    def _dedupe_tracks(self, tracks, template: str):
+        """Drop entries rendering to a filename already claimed by an earlier entry.
+
+        Parallel workers would otherwise both pass the exists() check and overwrite each other.
+        """
+        seen = set()
+        unique = []
+        for track in tracks:
+            # normcase only folds case where the filesystem does (Windows)
+            stem = os.path.normcase(music_manager.get_filename(template, track, ""))
+            if stem in seen:
+                logger.info(f"Skipping duplicate entry: {track['name']}")
+                continue
+            seen.add(stem)
+            unique.append(track)
+        return unique
+
     def _handle_direct_url(self, keyword: str) -> bool:
         type_, id_ = self.parse_url(keyword)
 
@@ -162,9 +172,13 @@ class UI:
                 return True
 
             print(f"Found {len(tracks)} tracks. Starting download...")
-            for track in tracks:
-                artists = ", ".join([ar["name"] for ar in track["ar"]])
-                music_manager.download_song(track["id"], track["name"], artists)
+            opts = DownloadOptions.from_config()
+            tracks = self._dedupe_tracks(tracks, opts.template)
+            # Playlist entries already carry full song info; only audio URLs and covers are prefetched
+            audios = asyncio.run(fetch_all(tracks, opts=opts))
+            workers = max(1, int(config_manager.get("concurrency", 6)))
+            with ThreadPoolExecutor(max_workers=workers) as ex:
+                list(ex.map(partial(self._download_one, audios=audios, opts=opts), tracks))
             print("Playlist download complete.")
             self._auto_check_failed()
             return True
@@ -703,27 +717,36 @@ class UI:
         except CancelledError:
             return
 
-    def menu_login_netease_qr(self):
-        print("Generating QR code...")
-        unikey = music_manager.login_qr_get_key()
-        url = f"https://music.163.com/login?codekey={unikey}"
-        save_qr_and_open(url)
-        
+    async def _poll_netease_qr(self, unikey: str):
+        """Poll QR status with exponential backoff (0.5s up to 4s), reset when the state changes."""
+        delay = 0.5
+        last_code = None
         while True:
-            time.sleep(2)
-            res = music_manager.login_qr_check(unikey)
+            await asyncio.sleep(delay)
+            res = await asyncio.to_thread(music_manager.login_qr_check, unikey)
             code = res.get("code")
             if code == 800:
                 print("QR Code expired.")
-                break
-            elif code == 801:
-                pass
-            elif code == 802:
+                return
+            elif code == 802 and last_code != 802:
                 print("Scanned, waiting for confirmation...")
             elif code == 803:
                 print("Login successful!")
                 music_manager.save_session()
-                break
+                return
+            delay = 0.5 if code != last_code else min(delay * 1.5, 4)
+            last_code = code
+
+    def menu_login_netease_qr(self):
+        print("Generating QR code...")
+        unikey = music_manager.login_qr_get_key()
+        url = f"https://music.163.com/login?codekey={unikey}"
+        save_qr_and_open(url)
+        
+        try:
+            asyncio.run(self._poll_netease_qr(unikey))
+        except KeyboardInterrupt:
+            print("QR login cancelled.")
 
     def menu_login_netease_anon(self):
         if music_manager.login_anonymous():
@@ -807,6 +830,7 @@ class UI:
                 current_output = config_manager.get("output_dir", "downloads")
                 current_template = config_manager.get("template", "{title} - {artist}")
                 current_overwrite = config_manager.get("overwrite", False)
+                current_concurrency = config_manager.get("concurrency", 6)
                 
                 choices = [
                     Choice("N Settings", "netease"),
@@ -814,6 +838,7 @@ class UI:
                     Choice(f"Output Directory: {current_output}", "output"),
                     Choice(f"Filename Template: {current_template}", "template"),
                     Choice(f"Overwrite Files: {'Yes' if current_overwrite else 'No'}", "overwrite"),
+                    Choice(f"Download Concurrency: {current_concurrency}", "concurrency"),
                     Choice("Back", "back")
                 ]
                 
@@ -863,6 +888,17 @@ class UI:
                         config_manager.set("overwrite", new_val)
                     except CancelledError:
                         pass
+
+                elif selection.data == "concurrency":
+                    try:
+                        new_val = InputPrompt(f"Enter parallel downloads for playlists (current: {current_concurrency}):").prompt()
+                        if new_val:
+                            if new_val.strip().isdigit() and int(new_val) > 0:
+                                config_manager.set("concurrency", int(new_val))
+                            else:
+                                logger.warning("Concurrency must be a positive integer.")
+                    except CancelledError:
+                        pass
                 
                 elif selection.data == "netease":
                     self.menu_settings_netease()